@@ -4,6 +4,7 @@ CSP as arguments so that basic backtracking, forward-checking or GAC can be
 executed depending on the propagator used.
 '''
 
+import heapq
 import time
 
 class BT:
@@ -19,8 +20,13 @@ class BT:
         self.nDecisions = 0
         # nPrunings is the number of value prunings during search
         self.nPrunings  = 0
-        # used to track unassigned variables
-        unasgn_vars = list()
+        # used to track unassigned variables. A dict is used as an insertion
+        # ordered set so adding and removing a variable is O(1)
+        self.unasgn_vars = dict()
+        # lazy-deletion min-heap of (domain size, -dynamic degree, stamp, var)
+        # used by MRV
+        self._heap = []
+        self._stamp = 0
         self.TRACE = False
         self.runtime = 0
 
@@ -50,23 +56,53 @@ class BT:
 
     def extractMRVvar(self):
         '''Remove variable with minimum sized current domain from list of
-           unassigned vars.
+           unassigned vars, breaking ties on the largest dynamic degree.
+           Entries are popped from the heap until one is found for a still
+           unassigned variable whose cached domain size is current; out of
+           date entries are pushed back with their new size. A stale degree
+           only affects tie breaking so it is not checked.
         '''
-        md = -1
-        mv = None
-        for v in self.unasgn_vars:
-            if md < 0:
-                md = v.cur_domain_size()
-                mv = v
-            elif v.cur_domain_size() < md:
-                md = v.cur_domain_size()
-                mv = v
-        self.unasgn_vars.remove(mv)
-        return mv
+        while True:
+            size, ddeg, stamp, mv = heapq.heappop(self._heap)
+            if mv not in self.unasgn_vars:
+                continue
+            if size != mv.cur_domain_size():
+                self.pushMRVvar(mv)
+                continue
+            del self.unasgn_vars[mv]
+            return mv
+
+    def pushMRVvar(self, var):
+        '''Push var on the MRV heap keyed on its current domain size'''
+        self._stamp = self._stamp + 1
+        heapq.heappush(self._heap, (var.cur_domain_size(),
+                                    -self.dynamicDegree(var), self._stamp, var))
+
+    def dynamicDegree(self, var):
+        '''Number of constraints over var that still have another unassigned
+           variable in their scope'''
+        n = 0
+        for c in self.csp.get_cons_with_var(var):
+            if c.get_n_unasgn() >= 2:
+                n = n + 1
+        return n
+
+    def updateMRVvars(self, prunings):
+        '''Re-key unassigned variables whose domains were just pruned. Pruning
+           only shrinks a domain, so the stale entries left behind are caught
+           by the size check in extractMRVvar'''
+        for var, val in prunings:
+            if var in self.unasgn_vars:
+                self.pushMRVvar(var)
 
     def restoreUnasgnVar(self, var):
         '''Add variable back to list of unassigned vars'''
-        self.unasgn_vars.append(var)
+        self.unasgn_vars[var] = None
+        self.pushMRVvar(var)
+
+    def restoreUnasgnVar_MS(self, var):
+        '''Add variable back to list of unassigned vars (Minesweeper search)'''
+        self.unasgn_vars[var] = None
 
     def bt_search(self,propagator):
         '''Try to solve the CSP using specified propagator routine. The
@@ -81,15 +117,20 @@ class BT:
 
         self.restore_all_variable_domains()
 
-        self.unasgn_vars = []
+        self.unasgn_vars = dict()
         for v in self.csp.vars:
             if not v.is_assigned():
-                self.unasgn_vars.append(v)
+                self.unasgn_vars[v] = None
 
         # initial propagate no assigned variables.
         status, prunings = propagator(self.csp)
         self.nPrunings = self.nPrunings + len(prunings)
 
+        self._heap = [(v.cur_domain_size(), -self.dynamicDegree(v), i, v)
+                      for i, v in enumerate(self.unasgn_vars)]
+        heapq.heapify(self._heap)
+        self._stamp = len(self._heap)
+
         if self.TRACE:
             print(len(self.unasgn_vars), " unassigned variables at start of search")
             print("Root Prunings: ", prunings)
@@ -115,46 +156,72 @@ class BT:
 
     def bt_recurse(self, propagator, level):
         '''Return true if found solution. False if still need to search.
-           If top level returns false--> no solution'''
-
-        if self.TRACE:
-            print('  ' * level, "bt_recurse level ", level)
+           If top level returns false--> no solution.
+           The search is iterative: each frame on the stack is
+           [var, values to try, index of next value, prunings of the value
+           currently assigned (None if no value is assigned)]'''
+
+        # TRACE is read once, the flag is tested at every step of the loop
+        trace = self.TRACE
+        stack = []
+        while True:
+            level_now = level + len(stack)
+
+            if trace:
+                print('  ' * level_now, "bt_recurse level ", level_now)
+
+            if not self.unasgn_vars:
+                #all variables assigned
+                return True
 
-        if not self.unasgn_vars:
-            #all variables assigned
-            return True
-        else:
             var = self.extractMRVvar()
 
-            if self.TRACE:
-                print('  ' * level, "bt_recurse var = ", var)
+            if trace:
+                print('  ' * level_now, "bt_recurse var = ", var)
+
+            stack.append([var, var.cur_domain(), 0, None])
+
+            # Move to the next value of the frame on top of the stack, popping
+            # frames whose values are used up, until a value propagates.
+            while stack:
+                frame = stack[-1]
+                var, vals, i, prunings = frame
+                level_now = level + len(stack) - 1
+
+                if prunings is not None:
+                    if trace:
+                        print('  ' * level_now, "bt_recurse restoring ", prunings)
+                    self.restoreValues(prunings)
+                    var.unassign()
+                    frame[3] = None
 
-            for val in var.cur_domain():
+                if i == len(vals):
+                    self.restoreUnasgnVar(var)
+                    stack.pop()
+                    continue
 
-                if self.TRACE:
-                    print('  ' * level, "bt_recurse trying", var, "=", val)
+                val = vals[i]
+                frame[2] = i + 1
+
+                if trace:
+                    print('  ' * level_now, "bt_recurse trying", var, "=", val)
 
                 var.assign(val)
                 self.nDecisions = self.nDecisions+1
 
                 status, prunings = propagator(self.csp, var)
                 self.nPrunings = self.nPrunings + len(prunings)
+                frame[3] = prunings
 
-                if self.TRACE:
-                    print('  ' * level, "bt_recurse prop status = ", status)
-                    print('  ' * level, "bt_recurse prop pruned = ", prunings)
+                if trace:
+                    print('  ' * level_now, "bt_recurse prop status = ", status)
+                    print('  ' * level_now, "bt_recurse prop pruned = ", prunings)
 
                 if status:
-                    if self.bt_recurse(propagator, level+1):
-                        return True
-
-                if self.TRACE:
-                    print('  ' * level, "bt_recurse restoring ", prunings)
-                self.restoreValues(prunings)
-                var.unassign()
-
-            self.restoreUnasgnVar(var)
-            return False
+                    self.updateMRVvars(prunings)
+                    break
+            else:
+                return False
 
     def bt_search_MS(self,propagator):
         '''This is modified from bt_search function that is modified for
@@ -166,10 +233,10 @@ class BT:
         self.clear_stats()
         stime = time.process_time()
 
-        self.unasgn_vars = []
+        self.unasgn_vars = dict()
         for v in self.csp.vars:
             if not v.is_assigned():
-                self.unasgn_vars.append(v)
+                self.unasgn_vars[v] = None
 
         # initial propagate no assigned variables.
         status, prunings = propagator(self.csp)
@@ -195,48 +262,70 @@ class BT:
     def bt_recurse_MS(self, propagator, level):
         '''This is modified from bt_recurse function.
         1. Using extractMRVvar_MS() instead of extractMRVvar()
+        2. Using restoreUnasgnVar_MS() instead of restoreUnasgnVar()
         Return true if found solution. False if still need to search.
         If top level returns false--> no solution'''
 
-        if self.TRACE:
-            print('  ' * level, "bt_recurse level ", level)
+        # TRACE is read once, the flag is tested at every step of the loop
+        trace = self.TRACE
+        stack = []
+        while True:
+            level_now = level + len(stack)
+
+            if trace:
+                print('  ' * level_now, "bt_recurse level ", level_now)
+
+            if not self.unasgn_vars:
+                # all variables assigned
+                return True
 
-        if not self.unasgn_vars:
-            # all variables assigned
-            return True
-        else:
             var = self.extractMRVvar_MS()
             if not var:
                 return True
-            if self.TRACE:
-                print('  ' * level, "bt_recurse var = ", var)
 
-            for val in var.cur_domain():
+            if trace:
+                print('  ' * level_now, "bt_recurse var = ", var)
+
+            stack.append([var, var.cur_domain(), 0, None])
 
-                if self.TRACE:
-                    print('  ' * level, "bt_recurse trying", var, "=", val)
+            while stack:
+                frame = stack[-1]
+                var, vals, i, prunings = frame
+                level_now = level + len(stack) - 1
+
+                if prunings is not None:
+                    if trace:
+                        print('  ' * level_now, "bt_recurse restoring ", prunings)
+                    self.restoreValues(prunings)
+                    var.unassign()
+                    frame[3] = None
+
+                if i == len(vals):
+                    self.restoreUnasgnVar_MS(var)
+                    stack.pop()
+                    continue
+
+                val = vals[i]
+                frame[2] = i + 1
+
+                if trace:
+                    print('  ' * level_now, "bt_recurse trying", var, "=", val)
 
                 var.assign(val)
                 self.nDecisions = self.nDecisions+1
 
                 status, prunings = propagator(self.csp, var)
                 self.nPrunings = self.nPrunings + len(prunings)
+                frame[3] = prunings
 
-                if self.TRACE:
-                    print('  ' * level, "bt_recurse prop status = ", status)
-                    print('  ' * level, "bt_recurse prop pruned = ", prunings)
+                if trace:
+                    print('  ' * level_now, "bt_recurse prop status = ", status)
+                    print('  ' * level_now, "bt_recurse prop pruned = ", prunings)
 
                 if status:
-                    if self.bt_recurse_MS(propagator, level+1):
-                        return True
-
-                if self.TRACE:
-                    print('  ' * level, "bt_recurse restoring ", prunings)
-                self.restoreValues(prunings)
-                var.unassign()
-
-            self.restoreUnasgnVar(var)
-            return False
+                    break
+            else:
+                return False
 
     def extractMRVvar_MS(self):
         '''Remove variable from list of unassigned variables. The variable with
@@ -244,7 +333,7 @@ class BT:
         '''
         for var in self.unasgn_vars:
             if var.cur_domain_size() == 1:
-                self.unasgn_vars.remove(var)
+                del self.unasgn_vars[var]
                 return var
 
         for con in self.csp.get_all_cons():
@@ -252,6 +341,6 @@ class BT:
                 continue
             if con.get_n_unasgn() == 1:
                 mv = con.get_unasgn_vars()[0]
-                self.unasgn_vars.remove(mv)
+                del self.unasgn_vars[mv]
                 return mv
         return None
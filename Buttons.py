@@ -1,12 +1,14 @@
 from tkinter import *
+from Cell import *
 
 
-class Buttons(Button):
+class Buttons(Cell):
     '''FieldButton Class:
-       This is a class extend Button.
+       This is a class extend Cell. The cell is drawn as an image item on the board's canvas,
+       so the whole board is one widget instead of one Button per cell.
     '''
 
-    def __init__(self, x, y, frame, images, value=0):
+    def __init__(self, x, y, canvas, images, value=0):
 
         self.img_blank = images['blank']
         self.img_mine = images['mine']
@@ -15,118 +17,63 @@ class Buttons(Button):
         self.img_wrong = images['wrong']
         self.img_no = images['no']
 
-        super(Buttons, self).__init__(frame, image=self.img_blank)
+        Cell.__init__(self, x, y, value)
 
-        self._x = x
-        self._y = y
-        self._value = value
-        self.is_a_mine = False
-        self.is_visible = False
-        self.is_flagged = False
-        if value == -1:
-            self.is_a_mine = True
+        # x is the row and y the column, every image has the size of the blank cell
+        self.canvas = canvas
+        self.item = canvas.create_image(y * self.img_blank.width(), x * self.img_blank.height(),
+                                        image=self.img_blank, anchor=NW)
 
-    @property
-    def x(self):
-        '''Return coordinate x.
-
-        :return: int
-        '''
-
-        return self._x
-
-    @property
-    def y(self):
-        '''Return coordinate y.
-
-        :return: int
-        '''
-
-        return self._y
-
-    @property
-    def value(self):
-        '''Return button value. -1 indicates mine and 0-8 indicate the amount of mines in surrounding buttons.
-
-        :return: int
-        '''
-
-        return self._value
-
-    @value.setter
-    def value(self, value):
-        '''Set button value. -1 indicates mine and 0-8 indicate the amount of mines in surrounding buttons.
+    def config(self, image):
+        '''Set the image shown for the button.
         '''
 
-        self._value = value
-        if self._value == -1:
-            self.is_a_mine = True
+        self.canvas.itemconfigure(self.item, image=image)
 
-    def flag(self):
-        '''Flag button if it's not flagged and not showed; unflag it otherwise.
+    def flag(self, draw=True):
+        '''Flag button if it's not flagged and not showed; unflag it otherwise. The image is only
+        updated if draw is True.
         '''
 
         if not self.is_visible:
-            if self.is_flagged:
-                self.config(image=self.img_blank)
-            else:
-                self.config(image=self.img_flag)
+            if draw:
+                if self.is_flagged:
+                    self.config(image=self.img_blank)
+                else:
+                    self.config(image=self.img_flag)
             self.is_flagged = not self.is_flagged
 
-    def is_flag(self):
-        '''Return True if button is flagged; False otherwise.
-
-        :return: bool
-        '''
-
-        return self.is_flagged
-
-    def place_mine(self):
-        '''Set button to a mine if it's not a mine. Return True if set button sucessfully; False otherwise.
-
-        :return: bool
-        '''
-
-        if not self.is_a_mine:
-            self._value = -1
-            self.is_a_mine = True
-            return True
-        return False
-
-    def is_mine(self):
-        """Return true if button it's a mine; false otherwise;
-
-        :return: bool
-        """
-
-        return self.is_a_mine
-
-    def show(self):
-        '''Set button to visible if it's not flagged.
+    def show(self, draw=True):
+        '''Set button to visible if it's not flagged. The image is only updated if draw is True.
         '''
 
         if not self.is_visible and not self.is_flagged:
             self.is_visible = True
+            if not draw:
+                return
             if self.is_mine():
                 self.config(image=self.img_mine)
             else:
                 self.config(image=self.img_no[self._value])
 
-    def is_seen(self):
-        '''Return True if button is visible; False otherwise.
+    def reset(self, draw=True):
+        '''Reset button to empty button. The image is only updated if draw is True.
         '''
 
-        return self.is_visible
+        Cell.reset(self)
+        if draw:
+            self.show_blank()
 
-    def reset(self):
-        '''Reset button to empty button.
+    def draw(self):
+        '''Update the image to match the button's current state.
         '''
 
-        self._value = 0
-        self.is_a_mine = False
-        self.is_visible = False
-        self.is_flagged = False
-        self.show_blank()
+        if self.is_visible:
+            self.config(image=self.img_mine if self.is_a_mine else self.img_no[self._value])
+        elif self.is_flagged:
+            self.config(image=self.img_flag)
+        else:
+            self.show_blank()
 
     def show_wrong_flag(self):
         '''Set button to wrong flag.
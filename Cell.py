@@ -0,0 +1,128 @@
+class Cell:
+    '''Cell Class:
+       The state of one square of the board, without any GUI. Buttons extends it with the
+       images shown on screen; the drawing methods here do nothing so that a game can be
+       played headless.
+    '''
+
+    __slots__ = ('_x', '_y', '_value', 'is_a_mine', 'is_visible', 'is_flagged')
+
+    def __init__(self, x, y, value=0):
+
+        self._x = x
+        self._y = y
+        self._value = value
+        self.is_a_mine = False
+        self.is_visible = False
+        self.is_flagged = False
+        if value == -1:
+            self.is_a_mine = True
+
+    @property
+    def x(self):
+        '''Return coordinate x.
+
+        :return: int
+        '''
+
+        return self._x
+
+    @property
+    def y(self):
+        '''Return coordinate y.
+
+        :return: int
+        '''
+
+        return self._y
+
+    @property
+    def value(self):
+        '''Return cell value. -1 indicates mine and 0-8 indicate the amount of mines in surrounding cells.
+
+        :return: int
+        '''
+
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        '''Set cell value. -1 indicates mine and 0-8 indicate the amount of mines in surrounding cells.
+        '''
+
+        self._value = value
+        if self._value == -1:
+            self.is_a_mine = True
+
+    def flag(self, draw=True):
+        '''Flag cell if it's not flagged and not showed; unflag it otherwise.
+        '''
+
+        if not self.is_visible:
+            self.is_flagged = not self.is_flagged
+
+    def is_flag(self):
+        '''Return True if cell is flagged; False otherwise.
+
+        :return: bool
+        '''
+
+        return self.is_flagged
+
+    def place_mine(self):
+        '''Set cell to a mine if it's not a mine. Return True if set cell sucessfully; False otherwise.
+
+        :return: bool
+        '''
+
+        if not self.is_a_mine:
+            self._value = -1
+            self.is_a_mine = True
+            return True
+        return False
+
+    def is_mine(self):
+        """Return true if cell it's a mine; false otherwise;
+
+        :return: bool
+        """
+
+        return self.is_a_mine
+
+    def show(self, draw=True):
+        '''Set cell to visible if it's not flagged.
+        '''
+
+        if not self.is_visible and not self.is_flagged:
+            self.is_visible = True
+
+    def is_seen(self):
+        '''Return True if cell is visible; False otherwise.
+        '''
+
+        return self.is_visible
+
+    def reset(self, draw=True):
+        '''Reset cell to empty cell.
+        '''
+
+        self._value = 0
+        self.is_a_mine = False
+        self.is_visible = False
+        self.is_flagged = False
+
+    def draw(self):
+        '''Update the image to match the cell's current state. A plain cell has no image.
+        '''
+
+    def show_wrong_flag(self):
+        '''Set cell to wrong flag. A plain cell has no image.
+        '''
+
+    def show_hit_mine(self):
+        '''Set cell to hit mine. A plain cell has no image.
+        '''
+
+    def show_blank(self):
+        '''Set cell to blank. A plain cell has no image.
+        '''
@@ -7,44 +7,59 @@ class Constraint:
     '''Class for defining constraints variable objects specifes an
        ordering over variables.'''
 
+    __slots__ = ('scope', 'name', 'sat_tuples', '_n_unasgn', '_supports')
+
     def __init__(self, name, scope):
         '''Initialization function. Consraints are implemented as storing a set
         of satisfying tuples.
         '''
 
-        self.scope = list(scope)
+        self.scope = tuple(scope)
         self.name = name
+        # every satisfying tuple, mapped to the bit that numbers it in the
+        # support bitsets
         self.sat_tuples = dict()
 
-        # list of satisfying tuples that contain a particular variable/value
-        self.sup_tuples = dict()
+        # number of unassigned variables in scope, maintained by the scope
+        # variables once the constraint is added to a CSP
+        self._n_unasgn = 0
+        for v in self.scope:
+            if not v.is_assigned():
+                self._n_unasgn = self._n_unasgn + 1
+
+        # the satisfying tuples that contain a particular variable/value, as
+        # a bitset keyed on (var.vid, val): bit k is set when tuple k assigns
+        # val to var
+        self._supports = dict()
 
     def add_satisfying_tuples(self, tuples):
         '''We specify the constraint by adding its complete list of satisfying
-        tuples to sup_tuples.'''
+        tuples to the support bitsets.'''
+        # the attributes are read once, the loops below run per tuple value
+        sat = self.sat_tuples
+        supports = self._supports
+        vids = [var.vid for var in self.scope]
         for x in tuples:
-            t = tuple(x)  # ensure we have an immutable tuple
-            if not t in self.sat_tuples:
-                self.sat_tuples[t] = True
+            # ensure we have an immutable tuple, tuples are used as they are
+            t = x if isinstance(x, tuple) else tuple(x)
+            if t in sat:
+                continue
+            bit = 1 << len(sat)
+            sat[t] = bit
 
             # now put t in as a support for all of the variable values in it
-            for i, val in enumerate(t):
-                var = self.scope[i]
-                if not (var,val) in self.sup_tuples:
-                    self.sup_tuples[(var,val)] = []
-                self.sup_tuples[(var,val)].append(t)
+            for vid, val in zip(vids, t):
+                key = (vid, val)
+                supports[key] = supports.get(key, 0) | bit
 
     def get_scope(self):
-        '''get list of variables the constraint is over'''
-        return list(self.scope)
+        '''get tuple of variables the constraint is over. The scope is
+        immutable so it is returned without a copy'''
+        return self.scope
 
     def get_n_unasgn(self):
         '''return the number of unassigned variables in the constraint's scope'''
-        n = 0
-        for v in self.scope:
-            if not v.is_assigned():
-                n = n + 1
-        return n
+        return self._n_unasgn
 
     def get_unasgn_vars(self):
         '''return list of unassigned variables in constraint's scope. Note
@@ -55,24 +70,138 @@ class Constraint:
                 vs.append(v)
         return vs
 
-    def has_support(self, var, val):
+    def has_support(self, var, val, state=None):
         '''Test if a variable value pair has a supporting tuple (a set
            of assignments satisfying the constraint where each value is
-           still in the corresponding variables current domain
+           still in the corresponding variables current domain. state is an
+           optional result of revision_state() that the caller has already
+           built for the current domains.
         '''
-        if (var, val) in self.sup_tuples:
-            for t in self.sup_tuples[(var, val)]:
-                if self.tuple_is_valid(t):
-                    return True
-        return False
-
-    def tuple_is_valid(self, t):
-        '''Internal routine. Check if every value in tuple is still in
-           corresponding variable domains'''
-        for i, var in enumerate(self.scope):
-            if not var.in_cur_domain(t[i]):
-                return False
-        return True
+        if state is None:
+            state = self.revision_state()
+        return self._supports.get((var.vid, val), 0) & state != 0
+
+    def revision_state(self):
+        '''Internal routine. Return the state a GAC revision of this
+           constraint passes to has_support, for the current domains. Here
+           it is the bitset of tuples that are still valid: for each scope
+           variable the tuples using a value of its current domain,
+           intersected over the scope'''
+        supports = self._supports
+        live = -1
+        for var in self.scope:
+            var_live = 0
+            vid = var.vid
+            for val in var.cur_domain():
+                var_live |= supports.get((vid, val), 0)
+            live &= var_live
+            if not live:
+                return 0
+        return live
+
+    def after_prune(self, state, var, val):
+        '''Internal routine. Return a new state (state is a result of
+           revision_state() and is left unchanged) for after val is pruned
+           from var: the tuples assigning val to var are removed. The
+           supports of different values of var are disjoint, so this is
+           exact and saves rebuilding the state'''
+        return state & ~self._supports.get((var.vid, val), 0)
 
     def __str__(self):
         return("{}({})".format(self.name,[var.name for var in self.scope]))
+
+
+class SumConstraint(Constraint):
+    '''Constraint that the values of the variables in scope add up to k, as
+       given by a Minesweeper clue. No satisfying tuples are enumerated;
+       supports are found from the smallest and largest sums the other
+       variables can still make. This is exact when every current domain is
+       a range of consecutive integers, which always holds for 0/1 cells;
+       otherwise the sums the other variables can reach are built exactly.
+       revision_state() takes a snapshot of the domain bounds that a GAC
+       revision reuses for every check.'''
+
+    __slots__ = ('k',)
+
+    def __init__(self, name, scope, k):
+        '''Initialization function. k is the required sum of the scope'''
+        super().__init__(name, scope)
+        self.k = k
+
+    def has_support(self, var, val, state=None):
+        '''Test if a variable value pair has a supporting tuple, i.e. whether
+           the other variables can still sum to k - val. state is an optional
+           result of revision_state() that the caller has already built for
+           the current domains; var's own entry is subtracted from its
+           totals, so pruning var does not make it stale for var.
+        '''
+        if not var.in_cur_domain(val):
+            return False
+        if state is None:
+            state = self.revision_state()
+        lo, hi, gaps, empty, bounds = state
+        vmin, vmax, vgap, vempty = bounds[var.vid]
+        if empty != vempty:
+            return False
+        target = self.k - val
+        if not lo - vmin <= target <= hi - vmax:
+            return False
+        if gaps == vgap:
+            return True
+
+        # a domain has a gap, so not every sum between lo and hi is possible.
+        # Bit s of reach is set when the variables seen so far can sum to s.
+        reach = 1
+        for v in self.scope:
+            if v is var:
+                continue
+            sums = 0
+            for d in v.cur_domain():
+                sums |= reach << d
+            reach = sums
+        return (reach >> target) & 1 == 1
+
+    def revision_state(self):
+        '''Internal routine. Return a snapshot of the current domains as
+           (lo, hi, gaps, empty, bounds): bounds maps each scope variable's
+           vid to the (min, max, gap, empty) of its current domain, where gap
+           and empty are 1 for a domain that has a gap or no value, and lo,
+           hi, gaps and empty are the totals over the scope'''
+        bounds = dict()
+        lo = 0
+        hi = 0
+        gaps = 0
+        empty = 0
+        for v in self.scope:
+            b = domain_bounds(v)
+            bounds[v.vid] = b
+            lo = lo + b[0]
+            hi = hi + b[1]
+            gaps = gaps + b[2]
+            empty = empty + b[3]
+        return (lo, hi, gaps, empty, bounds)
+
+    def after_prune(self, state, var, val):
+        '''Internal routine. Return a new snapshot (state is a result of
+           revision_state() and is left unchanged) updated for the current
+           domain of var, after val is pruned from it'''
+        lo, hi, gaps, empty, bounds = state
+        old = bounds[var.vid]
+        b = domain_bounds(var)
+        # copied so that the caller's state keeps its own bounds
+        bounds = dict(bounds)
+        bounds[var.vid] = b
+        return (lo - old[0] + b[0], hi - old[1] + b[1],
+                gaps - old[2] + b[2], empty - old[3] + b[3], bounds)
+
+
+def domain_bounds(var):
+    '''Return (min, max, gap, empty) of the current domain of var, where gap
+       is 1 if the domain is not a run of consecutive values and empty is 1
+       if the domain has no value'''
+    dom = var.cur_domain()
+    if not dom:
+        return (0, 0, 0, 1)
+    dmin = min(dom)
+    dmax = max(dom)
+    return (dmin, dmax, 0 if dmax - dmin + 1 == len(dom) else 1, 0)
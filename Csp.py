@@ -25,25 +25,28 @@ class CSP:
     def add_var(self,v):
         '''Add variable object to CSP while setting up an index to obtain the
         constraints over this variable'''
-        if not type(v) is Variable:
+        if not isinstance(v, Variable):
             print("Trying to add non variable ", v, " to CSP object")
         elif v in self.vars_to_cons:
             print("Trying to add variable ", v, " to CSP object that already has it")
         else:
             self.vars.append(v)
-            self.vars_to_cons[v] = []
+            self.vars_to_cons[v] = ()
 
     def add_constraint(self,c):
         '''Add constraint to CSP. Note that all variables in the
         constraints scope must already have been added to the CSP'''
-        if not type(c) is Constraint:
+        if not isinstance(c, Constraint):
             print("Trying to add non constraint ", c, " to CSP object")
         else:
             for v in c.scope:
                 if not v in self.vars_to_cons:
                     print("Trying to add constraint ", c, " with unknown variables to CSP object")
                     return
-                self.vars_to_cons[v].append(c)
+                self.vars_to_cons[v] = self.vars_to_cons[v] + (c,)
+            for v in c.scope:
+                v._subscribe(c)
+            c._n_unasgn = sum(1 for v in c.scope if not v.is_assigned())
             self.cons.append(c)
 
     def get_all_cons(self):
@@ -51,8 +54,9 @@ class CSP:
         return self.cons
 
     def get_cons_with_var(self, var):
-        '''return list of constraints that include var in their scope'''
-        return list(self.vars_to_cons[var])
+        '''return tuple of constraints that include var in their scope. These
+        tuples are never modified in place so no copy is made'''
+        return self.vars_to_cons[var]
 
     def get_all_vars(self):
         '''return list of variables in the CSP'''
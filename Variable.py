@@ -3,86 +3,134 @@ This class represents a Variable in a CSP. Thus, a Variable can have a domain,
 but if none is passed in during initialization, the domain is set to empty.
 '''
 
+import itertools
+
 class Variable:
     '''Class for defining CSP variables. On initialization the variable object
     should be given a name, and optionally a list of domain values.
     '''
 
+    __slots__ = ('name', 'vid', 'dom', '_idx', '_full', 'curdom_mask',
+                 '_cur_size', '_doms', 'assignedValue', '_cons', 'cell')
+
+    # source of the sequential ids used to key per-variable tables
+    _vids = itertools.count()
+
     def __init__(self, name, domain=[]):
         '''Create a variable object, specifying its name (a string). Optionally
         specify the initial domain.
         '''
         self.name = name
-        self.dom = list(domain)
-        self.curdom = [True] * len(domain)
+        self.vid = next(Variable._vids)
+        # the domain never changes after construction, so it is kept as a tuple
+        self.dom = tuple(domain)
+        # position of each value in dom, replaces a dom.index() scan
+        self._idx = {v: i for i, v in enumerate(self.dom)}
+        # bit i of curdom_mask is set while dom[i] is in the current domain
+        self._full = (1 << len(self.dom)) - 1
+        self.curdom_mask = self._full
+        # number of values in the current domain, kept in step with the mask
+        self._cur_size = len(self.dom)
+        # tuple of values for each curdom_mask seen so far, for cur_domain
+        self._doms = dict()
         self.assignedValue = None
+        # constraints over this variable, notified on assign/unassign
+        self._cons = []
+        # (row, col) of the board cell the variable stands for, if any (set by
+        # csp_model). A position rather than the cell keeps the CSP free of
+        # references to Tk widgets
+        self.cell = None
 
     def domain(self):
-        '''return the variable's (permanent) domain'''
-        return(list(self.dom))
+        '''return the variable's (permanent) domain, as a tuple'''
+        return self.dom
 
     def prune_value(self, value):
         '''Remove value from CURRENT domain'''
-        self.curdom[self.value_index(value)] = False
+        bit = 1 << self._idx[value]
+        if self.curdom_mask & bit:
+            self.curdom_mask &= ~bit
+            self._cur_size -= 1
 
     def unprune_value(self, value):
         '''Restore value to CURRENT domain'''
-        self.curdom[self.value_index(value)] = True
+        bit = 1 << self._idx[value]
+        if not self.curdom_mask & bit:
+            self.curdom_mask |= bit
+            self._cur_size += 1
 
     def cur_domain(self):
-        '''Return list of values in CURRENT domain (if assigned only assigned
+        '''Return tuple of values in CURRENT domain (if assigned only assigned
         value is viewed as being in current domain)'''
-        vals = []
-        if self.is_assigned():
-            vals.append(self.get_assigned_value())
-        else:
-            for i, val in enumerate(self.dom):
-                if self.curdom[i]:
-                    vals.append(val)
+        if self.assignedValue is not None:
+            return (self.assignedValue,)
+        vals = self._doms.get(self.curdom_mask)
+        if vals is None:
+            # walk the set bits once for each mask the search reaches
+            vals = []
+            dom = self.dom
+            m = self.curdom_mask
+            while m:
+                b = m & -m
+                vals.append(dom[b.bit_length() - 1])
+                m ^= b
+            vals = tuple(vals)
+            self._doms[self.curdom_mask] = vals
         return vals
 
     def in_cur_domain(self, value):
         '''check if value is in CURRENT domain (without constructing list) if
         assigned only assigned value is viewed as being in current domain'''
-        if not value in self.dom:
+        # one dict lookup both checks the value is in dom and finds its bit
+        i = self._idx.get(value)
+        if i is None:
             return False
-        if self.is_assigned():
-            return value == self.get_assigned_value()
+        if self.assignedValue is not None:
+            return value == self.assignedValue
         else:
-            return self.curdom[self.value_index(value)]
+            return (self.curdom_mask >> i) & 1 == 1
 
     def cur_domain_size(self):
         '''Return the size of the variables domain (without construcing list)'''
-        if self.is_assigned():
+        if self.assignedValue is not None:
             return 1
         else:
-            return(sum(1 for v in self.curdom if v))
+            return self._cur_size
 
     def restore_curdom(self):
         '''return all values back into the current domain'''
-        for i in range(len(self.curdom)):
-            self.curdom[i] = True
+        self.curdom_mask = self._full
+        self._cur_size = len(self.dom)
 
     def is_assigned(self):
-        return self.assignedValue != None
+        return self.assignedValue is not None
 
     def assign(self, value):
         '''When we assign we remove all other values values from curdom. We save
         this information so that we can reverse it on unassign'''
 
-        if self.is_assigned() or not self.in_cur_domain(value):
+        if self.assignedValue is not None or not self.in_cur_domain(value):
             print("ERROR: trying to assign variable", self,
                   "that is already assigned or illegal value (not in curdom)")
             return
 
         self.assignedValue = value
+        for c in self._cons:
+            c._n_unasgn -= 1
 
     def unassign(self):
         '''Used by bt_search. Unassign and restore old current domain'''
-        if not self.is_assigned():
+        if self.assignedValue is None:
             print("ERROR: trying to unassign variable", self, " not yet assigned")
             return
         self.assignedValue = None
+        for c in self._cons:
+            c._n_unasgn += 1
+
+    def _subscribe(self, c):
+        '''Register constraint c so its count of unassigned variables is kept
+        up to date as this variable is assigned and unassigned'''
+        self._cons.append(c)
 
     def get_assigned_value(self):
         '''return assigned value. Returns None if is unassigned'''
@@ -91,10 +139,79 @@ class Variable:
     def value_index(self, value):
         '''Domain values need not be numbers, so return the index
            in the domain list of a variable value'''
-        return self.dom.index(value)
+        return self._idx[value]
 
     def __repr__(self):
         return("Var-{}".format(self.name))
 
     def __str__(self):
         return("Var--{}".format(self.name))
+
+
+class BinaryVariable(Variable):
+    '''Variable with the fixed domain [0, 1], as used for the cells of a
+    Minesweeper board. The current domain is kept as the two flags has_0 and
+    has_1 in place of a bitmask and size counter.
+    '''
+
+    __slots__ = ('has_0', 'has_1')
+
+    # current domains indexed by has_0 + 2 * has_1
+    _DOMAINS = ((), (0,), (1,), (0, 1))
+    _ASSIGNED = ((0,), (1,))
+
+    def __init__(self, name):
+        '''Create a binary variable object, specifying its name (a string).'''
+        self.name = name
+        self.vid = next(Variable._vids)
+        self.dom = (0, 1)
+        self._idx = {0: 0, 1: 1}
+        self.has_0 = True
+        self.has_1 = True
+        self.assignedValue = None
+        self._cons = []
+        self.cell = None
+
+    def prune_value(self, value):
+        '''Remove value from CURRENT domain'''
+        if value:
+            self.has_1 = False
+        else:
+            self.has_0 = False
+
+    def unprune_value(self, value):
+        '''Restore value to CURRENT domain'''
+        if value:
+            self.has_1 = True
+        else:
+            self.has_0 = True
+
+    def cur_domain(self):
+        '''Return tuple of values in CURRENT domain (if assigned only assigned
+        value is viewed as being in current domain)'''
+        if self.assignedValue is not None:
+            return self._ASSIGNED[self.assignedValue]
+        return self._DOMAINS[self.has_0 + 2 * self.has_1]
+
+    def in_cur_domain(self, value):
+        '''check if value is in CURRENT domain (without constructing list) if
+        assigned only assigned value is viewed as being in current domain'''
+        # assignedValue is 0 or 1, so matching it already means value is in dom
+        if self.assignedValue is not None:
+            return value == self.assignedValue
+        if value == 0:
+            return self.has_0
+        if value == 1:
+            return self.has_1
+        return False
+
+    def cur_domain_size(self):
+        '''Return the size of the variables domain (without construcing list)'''
+        if self.assignedValue is not None:
+            return 1
+        return self.has_0 + self.has_1
+
+    def restore_curdom(self):
+        '''return all values back into the current domain'''
+        self.has_0 = True
+        self.has_1 = True
@@ -1,22 +1,52 @@
+from Cell import *
 from Buttons import *
 from BT import *
 from propagators import *
 import minesweeper_csp
+import os
 import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
 '''Our executable file. The game board is a list of lists, where every item in the nested list is a Button object.
 Once revealed, a cell can be a numerical value between 1 and 8, representing how many bombs are adjacent to a the
 cell; a mine; or a blank square with no information. The Minesweeper class creates all of the game visualization and
 adds the buttons to the GUI, and calls the methods to solve single or multiple iterations of the game. '''
 
+# images shared by every game, loaded the first time a game is created
+IMAGES = {}
+
+
+def load_images():
+    """ Loads the game's images once, after the Tk root exists, and returns the shared table.
+    """
+
+    if not IMAGES:
+        IMAGES.update({'flag': PhotoImage(file="images/flag.gif"), 'mine': PhotoImage(file="images/mine.gif"),
+                       'blank': PhotoImage(file="images/blank_cell.gif"),
+                       'hit_mine': PhotoImage(file="images/mine_hit.gif"),
+                       'wrong': PhotoImage(file="images/mine_incorrect.gif"),
+                       'no': tuple(PhotoImage(file="images/img_" + str(i) + ".gif") for i in range(0, 9)),
+                       'smiley': PhotoImage(file="images/smiley.gif"),
+                       'smiley_won': PhotoImage(file="images/smiley_won.gif"),
+                       'smiley_lost': PhotoImage(file="images/smiley_lost.gif")})
+    return IMAGES
+
 
 class Minesweeper:
 
-    def __init__(self, master):
+    def __init__(self, master=None, size=None):
+        ''' Without a master the game is headless: cells are plain Cell objects and no widget is created.
+        size is an optional (rows, columns, mines) tuple; when given, an empty board of that size is built
+        instead of importing the board.
+        '''
 
-        # create a frame where the game will reside
-        self.frame = Frame(master)
-        self.frame.pack()
+        self.frame = None
+        self.canvas = None
+        if master is not None:
+            # create a frame where the game will reside
+            self.frame = Frame(master)
+            self.frame.pack()
 
         self.num_games = 0
         self.games_won = 0
@@ -25,37 +55,61 @@ class Minesweeper:
         self.cells = []
         self.mines = []
         self.board = []
+        # self._neighbors[row][col] is the tuple of cells adjacent to a cell
+        self._neighbors = []
+        # the same tuples keyed on the cell itself, so hot loops skip the x and y lookups
+        self._adjacent = {}
+        # the four corner cells, tried first by guess_move
+        self._corners = ()
+        # cells that are not mines and not yet visible; the game is won once it is empty
+        self._hidden_non_mine = set()
+        # cells that are neither visible nor flagged, in board order, for guess_move
+        self._hidden = {}
+        # visible numbered cells that may still have hidden neighbours, for the CSP model
+        self._border = set()
+        # solver results of frontier patterns seen so far, kept across games (see solve_pattern)
+        self._solved_patterns = {}
         self.done = False
+        # set by solve_x_times so that repeated games skip every GUI update
+        self._headless = master is None
 
         # These values can be changed. The default game is set to 16x16 with 40 mines.
         self.row = 16
         self.col = 16
         self.num_mines = 40
+        if size is not None:
+            self.row, self.col, self.num_mines = size
         self.mines_left = self.num_mines
+        # the value shown by the mines left label, so that it is only reconfigured when it changes
+        self._displayed_mines_left = None
         self.flags = 0
 
         self.first_click = True
         self.first_click_btn = None
 
-        # set up the smiley buttons, which will start/restart a game.
-        self.smiley_default = PhotoImage(file="images/smiley.gif")
-        self.smiley_won = PhotoImage(file="images/smiley_won.gif")
-        self.smiley_lost = PhotoImage(file="images/smiley_lost.gif")
+        self.images = None
+        if master is not None:
+            # a dictionary of images, where the key is a string describing the image and the value is the image file.
+            self.images = load_images()
 
-        # a dictionary of images, where the key is a string describing the image and the value is the image file.
-        self.images = {'flag': PhotoImage(file="images/flag.gif"), 'mine': PhotoImage(file="images/mine.gif"),
-                       'blank': PhotoImage(file="images/blank_cell.gif"),
-                       'hit_mine': PhotoImage(file="images/mine_hit.gif"),
-                       'wrong': PhotoImage(file="images/mine_incorrect.gif"), 'no': []}
-        for i in range(0, 9):
-            self.images['no'].append(PhotoImage(file="images/img_" + str(i) + ".gif"))
+            # set up the smiley buttons, which will start/restart a game.
+            self.smiley_default = self.images['smiley']
+            self.smiley_won = self.images['smiley_won']
+            self.smiley_lost = self.images['smiley_lost']
 
         # if the board is empty, import the game
-        if not board:
+        if not board or size is not None:
             self.init_board()
         else:
             self.create_board(board)
 
+        if master is not None:
+            self.init_widgets()
+
+    def init_widgets(self):
+        """ Creates the buttons and labels around the board.
+        """
+
         # Button object to restart the game
         self.restart_game_btn = Button(self.frame, image=self.smiley_default)
         # position the button in the grid
@@ -81,26 +135,126 @@ class Minesweeper:
         # widget will occupy 4 columns
         self.mines_left_label.grid(row=self.row + 1, column=0, columnspan=4, sticky=SW)
         self.mines_left_label_2 = Label(self.frame, text=self.num_mines)
+        self._displayed_mines_left = self.num_mines
         self.mines_left_label_2.grid(row=self.row + 1, column=4, columnspan=self.row, sticky=W)
 
+    def init_canvas(self):
+        """ Creates the canvas the cells are drawn on. Clicks on the canvas are passed to the cell under
+        the mouse, so the board needs a single widget and a single pair of bindings.
+        """
+
+        if self.frame is None:
+            return
+
+        self.canvas = Canvas(self.frame, width=self.col * self.images['blank'].width(),
+                             height=self.row * self.images['blank'].height(), highlightthickness=0)
+        # first row grid is for the new game button
+        self.canvas.grid(row=1, column=0, columnspan=self.col)
+        self.canvas.bind("<Button-1>", lambda event: self.canvas_clicked(event, self.left_clicked))
+        self.canvas.bind("<Button-3>", lambda event: self.canvas_clicked(event, self.right_clicked))
+
+    def canvas_clicked(self, event, action):
+        """ Calls action (left_clicked or right_clicked) on the cell at the position of a click on the
+        canvas. Clicks are ignored once the game is over.
+        """
+
+        row = event.y // self.images['blank'].height()
+        col = event.x // self.images['blank'].width()
+        if not self.done and 0 <= row < self.row and 0 <= col < self.col:
+            action(self.board[row][col])
+
     def init_board(self):
-        """ Creates the default board and places the cells on it (which are Button objects).
+        """ Creates the default board and places the cells on it (which are Buttons drawn on the canvas).
         A board is a list of lists, where each element of the inner list is a cell button.
         """
 
+        self.init_canvas()
         for row in range(self.row):
             # initialize outer list
             lst = []
             for col in range(self.col):
                 # initialize button. Each button has a row, column, frame, and defined image
-                button = Buttons(row, col, self.frame, self.images)
-                # first row grid
-                button.grid(row=row + 1, column=col)
+                button = self.new_cell(row, col)
                 # append inner list of buttons
                 lst.append(button)
                 self.cells.append(button)
             self.board.append(lst)
 
+        self.init_neighbors()
+        self.init_hidden()
+
+    def new_cell(self, row, col, value=0):
+        """ Return the cell at the given row and column: a Buttons drawn on the canvas, or a plain Cell
+        when the game is headless.
+        """
+
+        if self.canvas is None:
+            return Cell(row, col, value)
+        return Buttons(row, col, self.canvas, self.images, value)
+
+    def init_neighbors(self):
+        """ Precomputes the tuple of adjacent cells of every cell on the board, so that
+        get_adj_cells is a table lookup, and the tuple of corner cells.
+        """
+
+        # the board surrounded by a ring of None, so that no position needs a bounds check
+        padded = [[None] * (self.col + 2)]
+        padded.extend([None] + row + [None] for row in self.board)
+        padded.append([None] * (self.col + 2))
+
+        self._neighbors = []
+        for row in range(self.row):
+            # padded[row + 1][col + 1] is the cell at (row, col); the eight neighbours are
+            # written out row by row: the three cells above, left and right, the three below
+            above, middle, below = padded[row], padded[row + 1], padded[row + 2]
+            lst = []
+            for col in range(self.col):
+                adj_cells = (above[col], above[col + 1], above[col + 2], middle[col],
+                             middle[col + 2], below[col], below[col + 1], below[col + 2])
+                lst.append(tuple(cell for cell in adj_cells if cell is not None))
+            self._neighbors.append(lst)
+        self._adjacent = {cell: self._neighbors[cell.x][cell.y] for cell in self.cells}
+
+        self._corners = (self.board[0][0], self.board[0][self.col - 1], self.board[self.row - 1][0],
+                         self.board[self.row - 1][self.col - 1])
+
+    def init_hidden(self):
+        """ Rebuilds the sets of hidden cells from the board. Mines placed afterwards are
+        removed from self._hidden_non_mine by place_mines.
+        """
+
+        self._hidden_non_mine = {cell for cell in self.cells if not cell.is_mine()}
+        self._hidden = dict.fromkeys(cell for cell in self.cells if not cell.is_seen() and not cell.is_flag())
+        self._border = {cell for cell in self.cells if cell.is_seen() and cell.value > 0}
+
+    def show_cell(self, cell):
+        """ Shows a cell and removes it from the sets of hidden cells. Flagged cells stay hidden.
+        """
+
+        cell.show(not self._headless)
+        if cell.is_visible:
+            self._hidden_non_mine.discard(cell)
+            self._hidden.pop(cell, None)
+            if cell.value > 0:
+                self._border.add(cell)
+
+    def hidden_cells(self):
+        """ Return the cells that are neither visible nor flagged.
+        """
+
+        return self._hidden.keys()
+
+    def border_cells(self):
+        """ Return the visible numbered cells that still have a hidden, unflagged neighbour, in board order.
+        Cells whose neighbours are all visible or flagged are dropped from the border for good.
+        """
+
+        hidden = self._hidden
+        done = [cell for cell in self._border
+                if not any(neighbour in hidden for neighbour in self._adjacent[cell])]
+        self._border.difference_update(done)
+        return sorted(self._border, key=lambda cell: (cell.x, cell.y))
+
     def init_game(self):
         """ Resets all of the game's attributes so that a new game can start,
         including all of the buttons and labels displayed in the GUI. Increments
@@ -120,79 +274,57 @@ class Minesweeper:
         self.mines = []
 
         # The buttons should be reset at the start of every game.
+        draw = not self._headless
         for each in self.cells:
-            each.reset()
+            each.reset(draw)
+        # every cell is now hidden and none is a mine, so there is no need to scan the board
+        self._hidden_non_mine = set(self.cells)
+        self._hidden = dict.fromkeys(self.cells)
+        self._border = set()
+
+        if draw:
+            self.redraw_labels()
+
+    def redraw_labels(self):
+        """ Shows the current number of mines left and resets the smiley face.
+        """
 
         # reset mines left label
         # use config so mines_left can be modified during runtime
         self.mines_left_label_2.config(text=self.mines_left)
+        self._displayed_mines_left = self.mines_left
         # Reset the new game button, which is the smiley face.
         self.restart_game_btn.config(image=self.smiley_default)
 
     def place_mines(self):
-        """ Places mines on the game board randomly.
-        """
-        mines = self.num_mines
-        # while there are still mines left
-        while mines:
-            # get the surrounding cells, passing in the coordinates of the first cell that was clicked
-            buttons = self.get_adj_cells(self.first_click_btn.x, self.first_click_btn.y)
-            # append to the list of click buttons
-            buttons.append(self.first_click_btn)
-
-            # flag to check if random coordinates matches the initial click's 9 grids
-            match = True
-            row = None
-            col = None
-            while match:
-                row = random.choice(range(self.row))
-                col = random.choice(range(self.col))
-                match = False
-                for b in buttons:
-                    if (row == b.x) and (col == b.y):
-                        match = True
-                        break
-
-            # if a mine is being placed at a given cell
-            if self.board[row][col].place_mine():
-                # place it on the board
-                self.mines.append(self.board[row][col])
-                # update the surrounding buttons passing in the row, column, and value of 1
-                self.update_adj_cells(row, col, 1)
-                mines -= 1
-
-    def get_adj_cells(self, row, col):
-        """ Passing in a row and a column that define a cell on the board, return a list
-        of cells that surround it.
+        """ Places mines on the game board randomly, away from the first click.
         """
 
-        # all the positions of the cells that surround the given cell
-        adjacent_pos = ((-1, -1), (-1, 0), (-1, 1),
-                        (0, -1), (0, 1),
-                        (1, -1), (1, 0), (1, 1))
-
-        adj_cells = []
+        # the first cell that was clicked and its surrounding cells never hold a mine
+        forbidden = set(self._adjacent[self.first_click_btn])
+        forbidden.add(self.first_click_btn)
+        candidates = [cell for cell in self.cells if cell not in forbidden]
+
+        # count the mines around every cell first, then write each count once
+        counts = {}
+        for cell in random.sample(candidates, self.num_mines):
+            cell.place_mine()
+            # place it on the board
+            self.mines.append(cell)
+            self._hidden_non_mine.discard(cell)
+            for neighbour in self._adjacent[cell]:
+                counts[neighbour] = counts.get(neighbour, 0) + 1
+
+        for cell, count in counts.items():
+            if not cell.is_a_mine:
+                cell.value = count
 
-        for pos in adjacent_pos:
-            row_tmp = row + pos[0]
-            col_tmp = col + pos[1]
-            if 0 <= row_tmp < self.row and 0 <= col_tmp < self.col:
-                # append the cell at the coordinate
-                adj_cells.append(self.board[row_tmp][col_tmp])
-
-        return adj_cells
-
-    def update_adj_cells(self, row, col, val):
-        """Update the value of the adjacent cells to a given button, defined by the
-        row and column parameters.
+    def get_adj_cells(self, row, col):
+        """ Passing in a row and a column that define a cell on the board, return a tuple
+        of cells that surround it.
         """
 
-        # list of adjacent cells
-        cells = self.get_adj_cells(row, col)
-        for cell in cells:
-            if not cell.is_mine():
-                # if the cell is not a mine, increment val
-                cell.value += val
+        return self._neighbors[row][col]
 
     def left_clicked(self, button):
         """Left clicking on a button.
@@ -208,22 +340,31 @@ class Minesweeper:
             return
 
         # Case0: hits a number button, show the button.
-        button.show()
+        self.show_cell(button)
         # Case1: hits a mine, game over.
         if button.is_mine():
-            button.show_hit_mine()
-            self.restart_game_btn.config(image=self.smiley_lost)
+            if not self._headless:
+                button.show_hit_mine()
+                self.restart_game_btn.config(image=self.smiley_lost)
             self.game_over()
         # Case2: hits an empty button, keep showing surrounding buttons until all not empty.
         elif button.value == 0:
-            buttons = [button]
-            while buttons:
-                temp_button = buttons.pop()
-                surrounding = self.get_adj_cells(temp_button.x, temp_button.y)
-                for neighbour in surrounding:
-                    if not neighbour.is_seen() and neighbour.value == 0:
+            # breadth first flood, each cell is visited at most once. Shown cells are marked
+            # by being visible; flagged cells stay hidden, so they are remembered separately.
+            # It stops early once the last hidden cell that is not a mine is shown, since
+            # the game is then won.
+            buttons = deque([button])
+            flagged = set()
+            while buttons and self._hidden_non_mine:
+                temp_button = buttons.popleft()
+                for neighbour in self._adjacent[temp_button]:
+                    if neighbour.is_visible or neighbour in flagged:
+                        continue
+                    if neighbour.is_flagged:
+                        flagged.add(neighbour)
+                    self.show_cell(neighbour)
+                    if neighbour.value == 0:
                         buttons.append(neighbour)
-                    neighbour.show()
 
         # Check whether the game wins or not.
         if self.game_won():
@@ -239,47 +380,57 @@ class Minesweeper:
 
         # Flag/Unflag a button.
         if button.is_flag():
-            button.flag()
+            button.flag(not self._headless)
             self.flags -= 1
+            self._hidden[button] = None
         else:
-            button.flag()
+            button.flag(not self._headless)
             self.flags += 1
+            del self._hidden[button]
 
         # Update remaining mines label.
-        self.mines_left = (self.num_mines - self.flags) if self.flags < self.num_mines else 0
-        self.mines_left_label_2.config(text=self.mines_left)
+        self.update_mines_left()
 
-        if self.game_won():
-            self.game_over()
+    def update_mines_left(self):
+        """Recomputes the number of mines left from the flags and updates its label, unless the label
+        already shows it.
+        """
+
+        self.mines_left = (self.num_mines - self.flags) if self.flags < self.num_mines else 0
+        if not self._headless and self.mines_left != self._displayed_mines_left:
+            self.mines_left_label_2.config(text=self.mines_left)
+            self._displayed_mines_left = self.mines_left
 
     def game_over(self):
-        """Once the game is over, all the buttons are disabled and all of the mines are shown.
+        """Once the game is over, all the buttons are disabled and all of the mines are shown. The canvas
+        ignores clicks while done is set.
         """
 
         self.done = True
+        # nothing to show while solving headless
+        if self._headless:
+            return
+        # showing mines does not change whether the game is won, so check it once
+        won = self.game_won()
         for button in self.cells:
             if button.is_mine():
-                if not button.is_flag() and not self.game_won():
-                    button.show()
+                if not button.is_flag() and not won:
+                    self.show_cell(button)
             elif button.is_flag():
                 button.show_wrong_flag()
 
-            # disable the buttons
-            button.unbind('<Button-1>')
-            button.unbind('<Button-3>')
-
     def game_won(self):
         """Return true if the game is won and false otherwise. The conditions for the game being won are: all the
         cells are visible or flagged (if they are mines), and the amount of flags is equal to the amount of mines
         at the start of the game.
         """
 
-        for cell in self.cells:
-            # if there is a cell that is not visible and it is not a mine
-            if not cell.is_seen() and not cell.is_mine():
-                return False
+        # if there is a cell that is not visible and it is not a mine
+        if self._hidden_non_mine:
+            return False
 
-        self.restart_game_btn.config(image=self.smiley_won)
+        if not self._headless:
+            self.restart_game_btn.config(image=self.smiley_won)
         return True
 
     def solve_to_completion(self):
@@ -291,8 +442,9 @@ class Minesweeper:
         # Unflag all buttons.
         for cell in self.cells:
             if cell.is_flag():
-                cell.flag()
+                cell.flag(not self._headless)
                 self.flags -= 1
+                self._hidden[cell] = None
 
         while not self.done:
             assigned_variable = self.solve_step()
@@ -311,13 +463,23 @@ class Minesweeper:
         self.games_won = 0
         self.num_games = 0
         print("Board size: {0}x{1}\nMines #: {2}\n{3}".format(self.row, self.col, self.num_mines, "-" * 27))
-        for i in range(times):
-            self.solve_to_completion()
-            if self.game_won():
-                self.games_won += 1
-            self.init_game()
-            if (i + 1) % 100 == 0:
-                print("Solved: " + str(i + 1) + " times")
+        # only the printed results matter, so skip all GUI updates until the end
+        headless = self._headless
+        self._headless = True
+        try:
+            for i in range(times):
+                self.solve_to_completion()
+                if self.game_won():
+                    self.games_won += 1
+                self.init_game()
+                if (i + 1) % 100 == 0:
+                    print("Solved: " + str(i + 1) + " times")
+        finally:
+            self._headless = headless
+            if not headless:
+                for cell in self.cells:
+                    cell.draw()
+                self.redraw_labels()
 
         # Display results on terminal
         print("Results:")
@@ -329,24 +491,87 @@ class Minesweeper:
         self.games_won = 0
         self.num_games = 0
 
+    def solve_x_times_parallel(self, times, nprocs=None):
+        """
+           Parallel version of solve_x_times. Every game is played on a headless board in one of nprocs worker
+           processes (defaults to the number of CPUs); this game's board is left untouched. The seed of every
+           game is drawn from the random module, so seeding it makes a run reproducible. The workers play boards
+           with this game's number of rows, columns and mines.
+        """
+
+        print("Board size: {0}x{1}\nMines #: {2}\n{3}".format(self.row, self.col, self.num_mines, "-" * 27))
+        seeds = [random.getrandbits(32) for i in range(times)]
+        # the workers do not see this game, so every seed is sent with the size of the board to play
+        sizes = [(self.row, self.col, self.num_mines)] * times
+        games_won = 0
+        # about four batches of games per worker: few round trips, and workers that finish early can
+        # still pick up a batch. Each worker also keeps its pattern cache across the games it plays.
+        workers = nprocs or os.cpu_count() or 1
+        chunksize = max(1, times // (4 * workers))
+        with ProcessPoolExecutor(max_workers=nprocs) as pool:
+            for i, won in enumerate(pool.map(play_headless_game, seeds, sizes, chunksize=chunksize)):
+                games_won += won
+                if (i + 1) % 100 == 0:
+                    print("Solved: " + str(i + 1) + " times")
+
+        # Display results on terminal
+        print("Results:")
+        print("Matches played: " + str(times))
+        print("Wins: " + str(games_won))
+        print("Win rate: " + str(games_won / times))
+
     def guess_move(self):
         """ Guesses a move and returns an unclicked cell. If no variable is assigned by CSP, we call this
         function to guess the next move.
         """
 
-        cells = []
-        corners = [self.board[0][0], self.board[0][self.col - 1], self.board[self.row - 1][0],
-                   self.board[self.row - 1][self.col - 1]]
+        for cell in self._corners:
+            if cell in self._hidden:
+                return cell
 
-        for cell in self.cells:
-            if not cell.is_seen() and not cell.is_flag():
-                cells.append(cell)
+        return random.choice(list(self._hidden))
 
-        for cell in corners:
-            if not cell.is_seen() and not cell.is_flag():
-                return cell
+    def single_square_step(self):
+        """Apply the single square rule until nothing changes: if a visible number already has that many
+        flags around it, its other hidden neighbours are safe; if its hidden neighbours are exactly the mines
+        it still needs, they are all flagged. Return True if any cell was clicked or flagged.
 
-        return random.choice(cells)
+        :return: Return bool
+        """
+
+        is_assigned = False
+        changed = True
+        while changed and not self.done:
+            changed = False
+            for cell in self.cells:
+                # the cell flags are read directly, this loop runs over the whole board
+                if not cell.is_visible or cell.value == 0:
+                    continue
+                hidden = []
+                flagged = 0
+                for neighbour in self._adjacent[cell]:
+                    if neighbour.is_flagged:
+                        flagged += 1
+                    elif not neighbour.is_visible:
+                        hidden.append(neighbour)
+                if not hidden:
+                    continue
+                remaining = cell.value - flagged
+                if remaining == 0:
+                    for neighbour in hidden:
+                        # an earlier flood in this loop may have revealed it already
+                        if not neighbour.is_visible:
+                            self.left_clicked(neighbour)
+                elif remaining == len(hidden):
+                    for neighbour in hidden:
+                        self.right_clicked(neighbour)
+                else:
+                    continue
+                changed = is_assigned = True
+                if self.done:
+                    break
+
+        return is_assigned
 
     def solve_step(self):
         """Solve parts of the game bases on current board's information by using CSP.
@@ -355,33 +580,132 @@ class Minesweeper:
         :return: Return int
         """
 
+        # settle the trivial deductions first, the CSP only sees what is left
+        if self.single_square_step():
+            return True
+
+        if len(self.hidden_cells()) <= 20:
+            # the end-game constraint ties every hidden cell together, solve the whole board
+            assignments = self.solve_csp(minesweeper_csp.csp_model(self))
+        else:
+            assignments = {}
+            for clues, unknowns in self.frontier_components():
+                assignments.update(self.solve_pattern(clues, unknowns))
+
+        return self.apply_assignments(assignments)
+
+    def apply_assignments(self, assignments):
+        """Flags the cells assigned 1 and reveals the cells assigned 0 by solve_step. The flags are
+        placed in one batch, updating the mines left and its label once, before the cells are revealed.
+        Return True if any cell was flagged or revealed.
+
+        :return: Return bool
+        """
+
         is_assigned = False
+        draw = not self._headless
+        reveals = []
+        for cell in sorted(assignments, key=lambda cell: (cell.x, cell.y)):
+            if assignments[cell] == 1:
+                if not cell.is_flagged and not cell.is_visible:
+                    cell.flag(draw)
+                    self.flags += 1
+                    del self._hidden[cell]
+                    is_assigned = True
+            elif assignments[cell] == 0:
+                reveals.append(cell)
+
+        if is_assigned:
+            self.update_mines_left()
 
-        csp = minesweeper_csp.csp_model(self)
+        for cell in reveals:
+            # an earlier reveal may have flooded over it already
+            if not cell.is_visible:
+                self.left_clicked(cell)
+                is_assigned = True
 
+        return is_assigned
+
+    def solve_csp(self, csp):
+        """Search the given CSP and return a dictionary from every board cell whose variable was assigned
+        to its value.
+        """
+
+        assignments = {}
         solver = BT(csp)
         solver.bt_search_MS(prop_GAC)
         for var in csp.get_all_vars():
+            # skip the variables that are not a cell on the board, such as the overlap variables
+            if var.cell is None:
+                continue
+
+            if var.get_assigned_value() is not None:
+                row, col = var.cell
+                assignments[self.board[row][col]] = var.get_assigned_value()
+
+        return assignments
 
-            try:
-                cell = var.name.split()
-                row = int(cell[0])
-                col = int(cell[1])
-            except:
-                # continue if it's not a vriable in board.
-                # in board variable name's format: row, col
+    def frontier_components(self):
+        """Split the border into groups of clues that share hidden neighbours. Return a list of
+        (clues, unknowns) pairs, where clues are the visible numbered cells of a group and unknowns their
+        hidden, unflagged neighbours, both in board order.
+        """
+
+        hidden = self._hidden
+        border = self.border_cells()
+        unknowns_of = {clue: [cell for cell in self._adjacent[clue] if cell in hidden] for clue in border}
+        clues_of = {}
+        for clue in border:
+            for cell in unknowns_of[clue]:
+                clues_of.setdefault(cell, []).append(clue)
+
+        components = []
+        seen = set()
+        for start in border:
+            if start in seen:
                 continue
+            seen.add(start)
+            stack = [start]
+            clues = []
+            unknowns = set()
+            while stack:
+                clue = stack.pop()
+                clues.append(clue)
+                for cell in unknowns_of[clue]:
+                    if cell in unknowns:
+                        continue
+                    unknowns.add(cell)
+                    for other in clues_of[cell]:
+                        if other not in seen:
+                            seen.add(other)
+                            stack.append(other)
+            components.append((sorted(clues, key=lambda cell: (cell.x, cell.y)),
+                               sorted(unknowns, key=lambda cell: (cell.x, cell.y))))
+        return components
+
+    def solve_pattern(self, clues, unknowns):
+        """Return the solver's assignments for one group of clues given by frontier_components. The
+        result only depends on the clues' remaining mine counts and on which of their neighbours are
+        unknown, so it is cached under those, relative to the group's top left corner: the same pattern
+        anywhere on the board, in this game or a later one, is solved once.
+        """
 
-            if var.get_assigned_value() == 1:
-                if not self.board[row][col].is_flag():
-                    self.right_clicked(self.board[row][col])
-                    is_assigned = True
-            elif var.get_assigned_value() == 0:
-                if not self.board[row][col].is_seen():
-                    self.left_clicked(self.board[row][col])
-                    is_assigned = True
+        top = min(cell.x for cell in unknowns)
+        left = min(cell.y for cell in unknowns)
+        for clue in clues:
+            top = min(top, clue.x)
+            left = min(left, clue.y)
 
-        return is_assigned
+        key = (tuple((clue.x - top, clue.y - left,
+                      clue.value - sum(cell.is_flagged for cell in self._adjacent[clue])) for clue in clues),
+               tuple((cell.x - top, cell.y - left) for cell in unknowns))
+        solved = self._solved_patterns.get(key)
+        if solved is None:
+            assignments = self.solve_csp(minesweeper_csp.csp_model(self, clues))
+            solved = tuple((cell.x - top, cell.y - left, value) for cell, value in assignments.items())
+            self._solved_patterns[key] = solved
+
+        return {self.board[top + x][left + y]: value for x, y, value in solved}
 
     def create_board(self, board):
         """Import game from a list of lists with numbers.
@@ -389,6 +713,7 @@ class Minesweeper:
 
         self.row = len(board)
         self.col = len(board[0])
+        self.init_canvas()
 
         self.num_mines = 0
 
@@ -400,19 +725,40 @@ class Minesweeper:
         for row in range(self.row):
             lis = []
             for col in range(self.col):
-                button = Buttons(row, col, self.frame, self.images, board[row][col])
+                button = self.new_cell(row, col, board[row][col])
                 if button.is_mine():
                     self.mines.append(button)
                     self.num_mines += 1
-                # first row grid for new game button
-                button.grid(row=row + 1, column=col)
                 lis.append(button)
                 self.cells.append(button)
             self.board.append(lis)
 
+        self.init_neighbors()
+        self.init_hidden()
+
         self.mines_left = self.num_mines
 
 
+# the headless game a worker process plays its games on
+headless_game = None
+
+
+def play_headless_game(seed, size):
+    """ Play one headless game on a board of the given (rows, columns, mines) size after seeding the random
+    module with seed. Return True if the game was won. Each worker process keeps one headless board and resets
+    it between games of the same size.
+    """
+
+    global headless_game
+    if headless_game is None or (headless_game.row, headless_game.col, headless_game.num_mines) != size:
+        headless_game = Minesweeper(size=size)
+    else:
+        headless_game.init_game()
+    random.seed(seed)
+    headless_game.solve_to_completion()
+    return headless_game.game_won()
+
+
 def main():
     global root
     root = Tk()
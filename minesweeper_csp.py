@@ -2,65 +2,54 @@ from Variable import *
 from Constraint import *
 from Csp import *
 from BT import *
-import itertools
 
 
-def csp_model(minesweeper):
-    '''Initialize a csp model.
+def csp_model(minesweeper, clues=None):
+    '''Initialize a csp model. clues is an optional list of visible numbered
+    cells to build the constraints from, in board order; by default every
+    cell of the border is used and the end-game constraint may be added.
     '''
 
     csp = CSP("Minesweeper")
 
-    # list of lists, same structure as board in minesweeper
-    variables = []
-
-    # Initialize all variables in board.
-    for row in range(minesweeper.row):
-        temp_row = []
-        for col in range(minesweeper.col):
-            name = str(row) + " " + str(col)
-            if minesweeper.board[row][col].is_flag():
-                domain = [1]
-            elif minesweeper.board[row][col].is_seen():
-                domain = [0]
-            else:
-                domain = [0,1]
-            var = Variable(name, domain)
-            temp_row.append(var)
-            csp.add_var(var)
-        variables.append(temp_row)
+    # Variables are only made for hidden, unflagged cells that some constraint
+    # mentions; visible and flagged cells are known and take no part in the search.
+    # {cell(Buttons): variable}
+    variables = {}
+
+    def cell_var(cell):
+        if cell not in variables:
+            var = BinaryVariable(str(cell.x) + " " + str(cell.y))
+            var.cell = (cell.x, cell.y)
+            variables[cell] = var
+        return variables[cell]
 
     # Initialize all constraints.
     # cons = [[name(str), [variable, variable,..], sum(int)], ...]
     cons = []
-    unassign = []
-    for button in minesweeper.cells:
-        # Assign value to all known variables.
-        if button.is_seen():
-            variables[button.x][button.y].assign(0)
-        elif button.is_flag():
-            variables[button.x][button.y].assign(1)
-        else:
-            unassign.append(variables[button.x][button.y])
-        # Constraint info for a non-empty visible button.
-        if button.is_seen() and not button.value == 0:
-            surrounding = minesweeper.get_adj_cells(button.x, button.y)
-            scope = []
-            sum1 = button.value
-            for sur in surrounding:
-                if sur.is_flag():
-                    sum1 -= 1
-                if not sur.is_seen() and not sur.is_flag():
-                    scope.append(variables[sur.x][sur.y])
-            name = str(button.x) + " " + str(button.y)
-            # Avoid empty scope. (All surrounding buttons are either visible or flagged.)
-            if scope:
-                cons.append([name, scope, sum1])
+    # Constraint info for every non-empty visible button next to a hidden one.
+    for button in (minesweeper.border_cells() if clues is None else clues):
+        surrounding = minesweeper.get_adj_cells(button.x, button.y)
+        scope = []
+        sum1 = button.value
+        for sur in surrounding:
+            if sur.is_flagged:
+                sum1 -= 1
+            elif not sur.is_visible:
+                scope.append(cell_var(sur))
+        name = str(button.x) + " " + str(button.y)
+        cons.append([name, scope, sum1])
 
     # end-game: give it a fixed # 20:
-    if len(unassign) <= 20:
+    hidden = minesweeper.hidden_cells()
+    if clues is None and len(hidden) <= 20:
+        unassign = [cell_var(cell) for cell in sorted(hidden, key=lambda cell: (cell.x, cell.y))]
         cons.append(["endgame", unassign, minesweeper.mines_left])
 
+    # Add the variables in board order.
+    for cell in sorted(variables, key=lambda cell: (cell.x, cell.y)):
+        csp.add_var(variables[cell])
+
     # Sort cons by length of scope.
     cons.sort(key=lambda x: len(x[1]))
     # Reduce constraint's scope.
@@ -119,26 +108,9 @@ def csp_model(minesweeper):
 
     cons.extend(ol_cons)
 
-    # Create Constraint object for constraint in cons list.
+    # Create Constraint object for constraint in cons list. Every constraint,
+    # including those over overlap variables, is a sum and needs no tuple table.
     for con in cons:
-        constraint = Constraint(con[0],con[1])
-        tuples = satisfy_tuples(con[1],con[2])
-        constraint.add_satisfying_tuples(tuples)
-        csp.add_constraint(constraint)
+        csp.add_constraint(SumConstraint(con[0], con[1], con[2]))
 
     return csp
-
-
-def satisfy_tuples(scope, sum1):
-    '''
-    '''
-
-    product_list = []
-    for var in scope:
-        product_list.append(var.domain())
-    product = list(itertools.product(*product_list))
-    tuples = []
-    for tuple in product:
-        if sum(tuple) == sum1:
-            tuples.append(tuple)
-    return tuples
@@ -71,8 +71,9 @@ def FCCheck(C, x):
     '''
     pruned = []
     cur_dom = x.cur_domain()
+    state = C.revision_state()
     for val in cur_dom:
-        if not C.has_support(x, val):
+        if not C.has_support(x, val, state):
             x.prune_value(val)
             pruned.append((x, val))
             
@@ -94,36 +95,43 @@ def prop_GAC(csp, newVar=None):
     if not newVar:
         queue = cons.copy()
     else:
-        queue = csp.get_cons_with_var(newVar).copy()
+        queue = list(csp.get_cons_with_var(newVar))
 
     # For looping queue use an indicator count. It avoids keep append and
     # remove items in the queue list that may slow down the program.
+    # pending holds the constraints from queue[count:], so a constraint is
+    # only queued once without searching the rest of the queue for it.
+    pending = set(queue)
     count = 0
     while count < len(queue):
 
         con = queue[count]
         scope = con.get_scope()
 
-        for i in range(len(scope)):
-            var = scope[i]
+        # The state of con is built once per revision and then updated as
+        # values are pruned, instead of rebuilt for every check.
+        state = con.revision_state()
+        for var in scope:
             curdom = var.cur_domain()
             found = False
             for val in curdom:
-                if con.has_support(var, val):
+                if con.has_support(var, val, state):
                     continue
                 else:
                     found = True
                     var.prune_value(val)
                     pruned.append((var, val))
+                    state = con.after_prune(state, var, val)
                     if not var.cur_domain_size():
                         queue = []
                         return (False, pruned)
 
             if found:
-                cons = csp.get_cons_with_var(var)
-                for c in cons:
-                    if c not in queue[count:]:
+                for c in csp.get_cons_with_var(var):
+                    if c not in pending:
+                        pending.add(c)
                         queue.append(c)
+        pending.discard(con)
         count += 1
 
     return (True, pruned)
\ No newline at end of file